@@ -1,8 +1,28 @@
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, HTTPException
-import requests
+from fastapi.responses import ORJSONResponse
+import httpx
 from fastapi.middleware.cors import CORSMiddleware
 
-app = FastAPI()
+CATEGORY_SERVICE_URL = 'http://localhost:8008/categories'
+PAGE_SERVICE_URL = 'http://localhost:8000/pages'
+
+# sized for peak gateway concurrency, idle backend connections are kept alive for reuse
+# (backends are plain http://, where httpx only speaks HTTP/1.1, so http2 is not enabled)
+HTTP_LIMITS = httpx.Limits(max_connections=200, max_keepalive_connections=100, keepalive_expiry=30.0)
+HTTP_TIMEOUT = httpx.Timeout(5.0, connect=2.0)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """one pooled async http client shared by all handlers"""
+    app.state.client = httpx.AsyncClient(limits=HTTP_LIMITS, timeout=HTTP_TIMEOUT)
+    try:
+        yield
+    finally:
+        await app.state.client.aclose()
+
+app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],  
@@ -11,9 +31,6 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-CATEGORY_SERVICE_URL = 'http://localhost:8008/categories'
-PAGE_SERVICE_URL = 'http://localhost:8000/pages'
-
 @app.get("/")
 async def root():
     return {"message": "Hello World"}
@@ -21,74 +38,113 @@ async def root():
 @app.get("/categories/{id}")
 async def get_category_by_id(id):
     try:
-        response = requests.get(CATEGORY_SERVICE_URL + f"/{id}")
+        response = await app.state.client.get(CATEGORY_SERVICE_URL + f"/{id}")
         response.raise_for_status()
         return response.json()
     
-    except requests.exceptions.HTTPError as err:
+    except httpx.HTTPStatusError as err:
         print(f"HTTP Error occurred: {err}")
         raise HTTPException(status_code=err.response.status_code, detail=str(err))
     
-    except requests.exceptions.RequestException as err:
+    except httpx.HTTPError as err:
+        print(f"Error occurred: {err}")
+        raise HTTPException(status_code=500, detail=str(err))
+    
+@app.get("/pages/top")
+async def get_top_pages(limit: int = 10):
+    try:
+        response = await app.state.client.get(PAGE_SERVICE_URL + "/top", params={"limit": limit})
+        response.raise_for_status()
+        return response.json()
+    
+    except httpx.HTTPStatusError as err:
+        print(f"HTTP Error occurred: {err}")
+        raise HTTPException(status_code=err.response.status_code, detail=str(err))
+    
+    except httpx.HTTPError as err:
         print(f"Error occurred: {err}")
         raise HTTPException(status_code=500, detail=str(err))
     
 @app.get("/pages/{id}")
 async def get_page_by_id(id):
     try:
-        response = requests.get(PAGE_SERVICE_URL + f"/{id}")
+        response = await app.state.client.get(PAGE_SERVICE_URL + f"/{id}")
         response.raise_for_status()
         return response.json()
     
-    except requests.exceptions.HTTPError as err:
+    except httpx.HTTPStatusError as err:
         print(f"HTTP Error occurred: {err}")
         raise HTTPException(status_code=err.response.status_code, detail=str(err))
     
-    except requests.exceptions.RequestException as err:
+    except httpx.HTTPError as err:
         print(f"Error occurred: {err}")
         raise HTTPException(status_code=500, detail=str(err))
     
 @app.get("/pages/stats")
 async def get_page_stats():
     try:
-        response = requests.get(PAGE_SERVICE_URL + f"/stats")
+        response = await app.state.client.get(PAGE_SERVICE_URL + f"/stats")
         response.raise_for_status()
         return response.json()
     
-    except requests.exceptions.HTTPError as err:
+    except httpx.HTTPStatusError as err:
+        print(f"HTTP Error occurred: {err}")
+        raise HTTPException(status_code=err.response.status_code, detail=str(err))
+    
+    except httpx.HTTPError as err:
+        print(f"Error occurred: {err}")
+        raise HTTPException(status_code=500, detail=str(err))
+    
+@app.get("/pages/{id}/full")
+async def get_page_full(id):
+    """page together with the overall stats, both backend calls run concurrently"""
+    try:
+        page_response, stats_response = await asyncio.gather(
+            app.state.client.get(PAGE_SERVICE_URL + f"/{id}"),
+            app.state.client.get(PAGE_SERVICE_URL + "/stats")
+        )
+        page_response.raise_for_status()
+        stats_response.raise_for_status()
+        return {"page": page_response.json(), "stats": stats_response.json()}
+    
+    except httpx.HTTPStatusError as err:
         print(f"HTTP Error occurred: {err}")
         raise HTTPException(status_code=err.response.status_code, detail=str(err))
     
-    except requests.exceptions.RequestException as err:
+    except httpx.HTTPError as err:
         print(f"Error occurred: {err}")
         raise HTTPException(status_code=500, detail=str(err))
     
 @app.get("/pages/update_views/{id}")
 async def update_views(id):
     try:
-        response = requests.put(PAGE_SERVICE_URL + f"/{id}")
+        response = await app.state.client.put(PAGE_SERVICE_URL + f"/update_views/{id}")
         response.raise_for_status()
         return response.json()
     
-    except requests.exceptions.HTTPError as err:
+    except httpx.HTTPStatusError as err:
         print(f"HTTP Error occurred: {err}")
         raise HTTPException(status_code=err.response.status_code, detail=str(err))
     
-    except requests.exceptions.RequestException as err:
+    except httpx.HTTPError as err:
         print(f"Error occurred: {err}")
         raise HTTPException(status_code=500, detail=str(err))
 
 @app.get("/pages/delete/{id}")
 async def delete_page(id):
     try:
-        response = requests.delete(PAGE_SERVICE_URL + f"/delete/{id}")
+        response = await app.state.client.delete(PAGE_SERVICE_URL + f"/delete/{id}")
         response.raise_for_status()
         return response.json()
     
-    except requests.exceptions.HTTPError as err:
+    except httpx.HTTPStatusError as err:
         print(f"HTTP Error occurred: {err}")
         raise HTTPException(status_code=err.response.status_code, detail=str(err))
     
-    except requests.exceptions.RequestException as err:
+    except httpx.HTTPError as err:
         print(f"Error occurred: {err}")
-        raise HTTPException(status_code=500, detail=str(err))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(err))
+
+if __name__ == "__main__":
+    import uvicorn
+    uvicorn.run("aggregate:app", host="localhost", port=8080, loop="uvloop", http="httptools")
@@ -1,15 +1,46 @@
+import asyncio
 import pandas as pd
 import logging
 from typing import List, Dict, Optional, Set, Tuple
 from datetime import datetime
 from sqlalchemy import text
 import re
+from collections import OrderedDict
 
 from repositories.page_repository import PageRepository, Page
 from repositories.base_repository import DatabaseConnection
 
 logger = logging.getLogger(__name__)
 
+BATCH_SIZE = 1000  # rows per multi-row INSERT
+CHUNK_SIZE = 10_000  # csv rows read into memory at a time
+TEXT_COLUMNS = ['title', 'text', 'project_name', 'namespace_name', 'categories']
+CACHE_SIZE = 100_000  # max names kept per lookup cache
+_CAT_SPLIT = re.compile(r'\s*;\s*')  # category separator, surrounding whitespace included
+
+class LRUCache(OrderedDict):
+    """name -> ID dict bounded to maxsize entries, least recently used names are evicted first"""
+    
+    def __init__(self, maxsize: int = CACHE_SIZE):
+        super().__init__()
+        self.maxsize = maxsize
+    
+    def __getitem__(self, key):
+        value = super().__getitem__(key)
+        self.move_to_end(key)
+        return value
+    
+    def get(self, key, default=None):
+        if key in self:
+            return self[key]
+        return default
+    
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self.move_to_end(key)
+        if len(self) > self.maxsize:
+            self.popitem(last=False)
+
 class RepositoryBasedETL:
     """ETL using repository pattern"""
     
@@ -17,117 +48,202 @@ class RepositoryBasedETL:
         self.page_repo = page_repo
         self.db_url = db_url
         self.db = DatabaseConnection(db_url)
-        self.project_cache = {}  # cache for project name -> ID
-        self.namespace_cache = {}  # cache for namespace name -> ID
+        self.project_cache = LRUCache()  # cache for project name -> ID
+        self.namespace_cache = LRUCache()  # cache for namespace name -> ID
+        self.category_cache = LRUCache()  # cache for lowercased category name -> ID
+        self.existing_titles: Set[str] = set()  # lowercased titles already in page
     
-    def _cache_projects_and_namespaces(self):
+    async def _cache_projects_and_namespaces(self):
         """cache existing projects and namespaces"""
-        with self.db.get_session() as session:
+        async with self.db.get_session() as session:
             # cache projects
             query = text("SELECT id, name FROM project")
-            result = session.execute(query)
+            result = await session.execute(query)
             for row in result:
                 self.project_cache[row.name] = row.id
             
             # cache namespaces
             query = text("SELECT id, name FROM namespace")
-            result = session.execute(query)
+            result = await session.execute(query)
             for row in result:
                 self.namespace_cache[row.name] = row.id
     
-    def _get_or_create_cached(self, name: str, cache: Dict, table: str) -> Optional[int]:
-        """get or create entity with caching"""
-        if not name or pd.isna(name):
-            return None
+    async def _cache_existing_categories(self):
+        """cache existing categories by lowercased name"""
+        async with self.db.get_session() as session:
+            result = await session.execute(text("SELECT id, name FROM category"))
+            for row in result:
+                self.category_cache[row.name.lower()] = row.id
+    
+    async def _cache_existing_titles(self):
+        """cache lowercased titles of pages already in the database"""
+        async with self.db.get_session() as session:
+            result = await session.execute(text("SELECT title FROM page"))
+            self.existing_titles.update(title.strip().lower() for title in result.scalars())
+    
+    async def _resolve_names(self, session, names: List[str], cache: Dict, table: str) -> Dict[str, int]:
+        """name -> ID for every name in the batch, inserting only those not in the table yet"""
+        # the returned dict, not the bounded cache, is what the batch reads ids from:
+        # writing new ids into the cache may evict names resolved a moment earlier
+        resolved = {}
+        missing = []
+        for name in dict.fromkeys(names):
+            if not name:
+                continue
+            if name in cache:
+                resolved[name] = cache[name]  # __getitem__ marks the entry as recently used
+            else:
+                missing.append(name)
+        if not missing:
+            return resolved
         
-        # check cache 
-        if name in cache:
-            return cache[name]
+        # a miss may be an evicted name that already has a row
+        # ({table}.name is not unique, a blind INSERT would duplicate it)
+        query = text(f"""
+            SELECT min(id) AS id, name FROM {table}
+            WHERE name = ANY(:names)
+            GROUP BY name
+        """)
+        result = await session.execute(query, {'names': missing})
+        for row in result:
+            resolved[row.name] = cache[row.name] = row.id
+        missing = [name for name in missing if name not in resolved]
+        if not missing:
+            return resolved
         
-        # create in database
-        with self.db.get_session() as session:
-            query = text(f"""
-                INSERT INTO {table} (name) 
-                VALUES (:name)
-                RETURNING id
-            """)
-            result = session.execute(query, {'name': name})
-            session.commit()
-            
-            entity_id = result.fetchone()[0]
-            cache[name] = entity_id
-            return entity_id
+        query = text(f"""
+            INSERT INTO {table} (name)
+            SELECT unnest(CAST(:names AS text[]))
+            RETURNING id, name
+        """)
+        result = await session.execute(query, {'names': missing})
+        for row in result:
+            resolved[row.name] = cache[row.name] = row.id
+        return resolved
     
-    def process_row_with_repository(self, row: Dict) -> bool:
-        """process a single row"""
-        try:
-            title = str(row.get('title', '')).strip()
-            if not title:
-                return False
-            
-            # check if page exists
-            existing = self.page_repo.get_by_title(title)
-            if existing:
-                return False
-            
-            # get or create project
-            project_name = row.get('project_name')
-            project_id = None
-            if project_name and not pd.isna(project_name):
-                project_id = self._get_or_create_cached(
-                    str(project_name).strip(),
-                    self.project_cache,
-                    'project'
-                )
+    async def _resolve_categories(self, session, names: List[str]) -> Dict[str, int]:
+        """lowercased name -> ID for every category in the batch, uncached ones via one upsert"""
+        resolved = {}
+        missing = {}
+        for name in names:
+            key = name.lower()
+            if key in resolved or key in missing:
+                continue
+            if key in self.category_cache:
+                resolved[key] = self.category_cache[key]
+            else:
+                missing[key] = name
+        if not missing:
+            return resolved
+        
+        # DO UPDATE (not DO NOTHING) so RETURNING also yields already existing rows
+        query = text("""
+            INSERT INTO category (name)
+            SELECT unnest(CAST(:names AS text[]))
+            ON CONFLICT (LOWER(name)) DO UPDATE SET name = category.name
+            RETURNING id, name, (xmax = 0) AS inserted
+        """)
+        result = await session.execute(query, {'names': list(missing.values())})
+        created = 0
+        for row in result:
+            resolved[row.name.lower()] = self.category_cache[row.name.lower()] = row.id
+            created += row.inserted
+        if created:
+            logger.warning(f"created {created} empty categories")
+        return resolved
+    
+    async def _create_stage_tables(self, session):
+        """per-connection temp tables that COPY loads into, emptied on every commit"""
+        await session.execute(text("""
+            CREATE TEMP TABLE IF NOT EXISTS page_stage (
+                title text,
+                text text,
+                views bigint,
+                project_id integer,
+                namespace_id integer
+            ) ON COMMIT DELETE ROWS
+        """))
+        await session.execute(text("""
+            CREATE TEMP TABLE IF NOT EXISTS page_category_stage (
+                page_id integer,
+                category_id integer
+            ) ON COMMIT DELETE ROWS
+        """))
+    
+    async def process_batch(self, batch: pd.DataFrame) -> int:
+        """insert a chunk of prepare_frame() rows, pages and links go through COPY, returns pages created"""
+        titles = batch['title']
+        titles_lower = titles.str.lower()
+        keep = (titles != '') & ~titles_lower.isin(self.existing_titles) & ~titles_lower.duplicated()
+        if not keep.any():
+            return 0
+        
+        new = batch[keep]
+        titles = titles[keep]
+        project_names = new['project_name'].tolist()
+        namespace_names = new['namespace_name'].tolist()
+        
+        async with self.db.get_session() as session:
+            project_ids = await self._resolve_names(session, project_names, self.project_cache, 'project')
+            namespace_ids = await self._resolve_names(session, namespace_names, self.namespace_cache, 'namespace')
             
-            # get or create namespace
-            namespace_name = row.get('namespace_name')
-            namespace_id = None
-            if namespace_name and not pd.isna(namespace_name):
-                namespace_id = self._get_or_create_cached(
-                    str(namespace_name).strip(),
-                    self.namespace_cache,
-                    'namespace'
-                )
+            # COPY runs on the session's own asyncpg connection, inside the same transaction
+            connection = await session.connection()
+            raw_connection = (await connection.get_raw_connection()).driver_connection
+            await self._create_stage_tables(session)
             
-            # create page using repository
-            page = Page(
-                title=title,
-                text=str(row.get('text', '')).strip(),
-                views=int(row.get('view_count', 0) or 0),
-                project_id=project_id,
-                namespace_id=namespace_id,
-                status='stub'
+            await raw_connection.copy_records_to_table(
+                'page_stage',
+                records=zip(
+                    titles.tolist(),
+                    new['text'].tolist(),
+                    new['view_count'].tolist(),
+                    [project_ids.get(name) for name in project_names],
+                    [namespace_ids.get(name) for name in namespace_names]
+                ),
+                columns=['title', 'text', 'views', 'project_id', 'namespace_id']
             )
+            query = text("""
+                INSERT INTO page (title, text, views, project_id, namespace_id, status)
+                SELECT title, text, views, project_id, namespace_id, 'stub'
+                FROM page_stage
+                ON CONFLICT ((LOWER(title))) DO NOTHING
+                RETURNING id, title
+            """)
+            result = await session.execute(query)
+            page_ids = {row.title: row.id for row in result}
             
-            created = self.page_repo.create(page)
-            if not created or not created.id:
-                return False
-            
-            # process categories
-            categories = row.get('categories')
-            if categories and not pd.isna(categories):
-                self._process_categories_for_page(created.id, str(categories))
-            
-            return True
+            # page -> category links from the same chunk
+            links = new[['title']].assign(category=new['categories'].str.split(_CAT_SPLIT)).explode('category')
+            links = links[(links['category'].str.len() > 0) & links['title'].isin(page_ids.keys())]
+            page_categories = list(zip(links['title'].map(page_ids).tolist(), links['category'].tolist()))
             
-        except Exception as e:
-            logger.error(f"error processing row: {e}")
-            return False
-    
-    def _process_categories_for_page(self, page_id: int, categories_str: str):
-        """process categories using repository pattern"""
-        from repositories.category_repository import CategoryRepository
-        
-        category_repo = CategoryRepository(self.db_url)
-        categories = [cat.strip() for cat in categories_str.split(';') if cat.strip()]
+            if page_categories:
+                category_ids = await self._resolve_categories(session, [name for _, name in page_categories])
+                await raw_connection.copy_records_to_table(
+                    'page_category_stage',
+                    records=((page_id, category_ids[name.lower()]) for page_id, name in page_categories),
+                    columns=['page_id', 'category_id']
+                )
+                query = text("""
+                    INSERT INTO page_category (page_id, category_id)
+                    SELECT DISTINCT page_id, category_id FROM page_category_stage
+                    ON CONFLICT DO NOTHING
+                """)
+                await session.execute(query)
         
-        for category_name in categories:
-            # get or create category
-            category = category_repo.get_or_create_by_name(category_name)
-            if category and category.id:
-                # link page to category
-                category_repo.link_page_to_category(page_id, category.id)
+        self.existing_titles.update(titles_lower[keep])
+        return len(page_ids)
+
+    async def process_chunk(self, chunk: pd.DataFrame) -> int:
+        """clean one csv chunk and write it in BATCH_SIZE batches; returns pages created"""
+        chunk.columns = [col.strip().lower().replace(' ', '_') for col in chunk.columns]
+        chunk = prepare_frame(chunk)
+        created = 0
+        for start in range(0, len(chunk), BATCH_SIZE):
+            created += await self.process_batch(chunk.iloc[start:start + BATCH_SIZE])
+        logger.info(f"chunk done: {created} of {len(chunk)} rows created")
+        return created
 
 import sys
 import logging
@@ -135,27 +251,58 @@ import logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+def prepare_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """clean the text columns and view counts once for the whole frame instead of per row"""
+    for column in TEXT_COLUMNS:
+        df[column] = df[column].fillna('').astype(str).str.strip()
+    df['view_count'] = pd.to_numeric(df['view_count'], errors='coerce').fillna(0).astype('int64')
+    return df
+
 def run_simple_etl(csv_file: str, db_url: str):
     """
     simple one-function ETL
     """
+    return asyncio.run(_run_simple_etl(csv_file, db_url))
+
+async def _read_chunks(csv_file: str, queue: asyncio.Queue):
+    """producer: parse the csv chunk by chunk in a worker thread so reading overlaps the db writes"""
+    reader = pd.read_csv(csv_file, chunksize=CHUNK_SIZE)
+    try:
+        while True:
+            chunk = await asyncio.to_thread(next, reader, None)
+            if chunk is None:
+                break
+            await queue.put(chunk)
+    finally:
+        reader.close()
+        await queue.put(None)
+
+async def _run_simple_etl(csv_file: str, db_url: str):
     # setup database connection
     pageRepository = PageRepository(db_url)
     repositoryBasedETL = RepositoryBasedETL(pageRepository, db_url)
-    logger.info(f"Reading CSV: {csv_file}")
-    df = pd.read_csv(csv_file)
-    df.columns = [col.strip().lower().replace(' ', '_') for col in df.columns]
     stats = {
-        'total_rows': len(df),
+        'total_rows': 0,
         'pages_created': 0,
         'pages_skipped': 0
     }
-    for idx, row in df.iterrows():
-        result = repositoryBasedETL.process_row_with_repository(row.to_dict())
-        if result == True:
-            stats['pages_created'] += 1
-        else:
-            stats['pages_skipped'] += 1
-
+    await repositoryBasedETL._cache_projects_and_namespaces()
+    await repositoryBasedETL._cache_existing_categories()
+    await repositoryBasedETL._cache_existing_titles()
+    
+    logger.info(f"Reading CSV: {csv_file}")
+    # one chunk is parsed ahead while the previous one is being written
+    queue = asyncio.Queue(maxsize=1)
+    reader = asyncio.create_task(_read_chunks(csv_file, queue))
+    try:
+        while (chunk := await queue.get()) is not None:
+            created = await repositoryBasedETL.process_chunk(chunk)
+            stats['total_rows'] += len(chunk)
+            stats['pages_created'] += created
+            stats['pages_skipped'] += len(chunk) - created
+        await reader
+    finally:
+        reader.cancel()
+        await repositoryBasedETL.db.engine.dispose()
     logger.info(f"finished. stats: {stats}")
-    return(stats)
\ No newline at end of file
+    return(stats)
@@ -0,0 +1,4 @@
+-- case-insensitive uniqueness for category names
+-- lets get_or_create_by_name use a single INSERT ... ON CONFLICT ... RETURNING
+-- (fails if duplicate names already exist - merge them first)
+CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS idx_category_name_lower ON category (LOWER(name));
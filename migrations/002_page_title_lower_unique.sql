@@ -0,0 +1,4 @@
+-- case-insensitive uniqueness for page titles
+-- replaces the get_by_title pre-check before inserts with ON CONFLICT
+-- (fails if duplicate titles already exist - merge them first)
+CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS page_title_lower_uniq ON page (LOWER(title));
@@ -0,0 +1,5 @@
+-- trigram GIN indexes so search() ILIKE '%keyword%' on title/text is an index scan
+-- (only keywords of 3+ characters can use them)
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+CREATE INDEX CONCURRENTLY IF NOT EXISTS page_title_trgm ON page USING gin (title gin_trgm_ops);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS page_text_trgm ON page USING gin (text gin_trgm_ops);
@@ -0,0 +1,7 @@
+-- full-text search column for search(): title weighted above text
+-- 'simple' config so russian and english words are matched as-is without stemming
+ALTER TABLE page ADD COLUMN IF NOT EXISTS tsv tsvector GENERATED ALWAYS AS (
+    setweight(to_tsvector('simple', coalesce(title, '')), 'A') ||
+    setweight(to_tsvector('simple', coalesce(text, '')), 'B')
+) STORED;
+CREATE INDEX CONCURRENTLY IF NOT EXISTS page_tsv_gin ON page USING gin (tsv);
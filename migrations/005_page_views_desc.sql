@@ -0,0 +1,3 @@
+-- get_top_viewed / get_by_project order by views DESC
+-- turns ORDER BY views DESC LIMIT n into a short index scan instead of a full sort
+CREATE INDEX CONCURRENTLY IF NOT EXISTS page_views_desc ON page (views DESC);
@@ -0,0 +1,33 @@
+# read-through cache helpers shared by the FastAPI services
+import logging
+import orjson
+from redis.exceptions import RedisError
+
+logger = logging.getLogger(__name__)
+
+CACHE_TTL = 300  # seconds
+
+async def cache_get(redis, key: str):
+    """return the cached value for key, None on a miss or if redis is unavailable"""
+    try:
+        cached = await redis.get(key)
+    except RedisError as e:
+        logger.warning(f"redis get failed for '{key}': {e}")
+        return None
+    if cached is None:
+        return None
+    return orjson.loads(cached)
+
+async def cache_set(redis, key: str, value, ttl: int = CACHE_TTL):
+    """store value under key for ttl seconds, errors are logged and ignored"""
+    try:
+        await redis.set(key, orjson.dumps(value), ex=ttl)
+    except RedisError as e:
+        logger.warning(f"redis set failed for '{key}': {e}")
+
+async def cache_delete(redis, *keys: str):
+    """drop cached keys after a write, errors are logged and ignored"""
+    try:
+        await redis.delete(*keys)
+    except RedisError as e:
+        logger.warning(f"redis delete failed for {keys}: {e}")
@@ -1,11 +1,14 @@
 # repositories/base_repository.py
 import logging
+import threading
 from abc import ABC, abstractmethod
-from typing import List, Optional, Dict, Any, TypeVar, Generic
-from contextlib import contextmanager
-from sqlalchemy import create_engine, text
-from sqlalchemy.orm import sessionmaker, Session
+from typing import AsyncIterator, List, Optional, Dict, Any, TypeVar, Generic, Union
+from contextlib import asynccontextmanager
+from sqlalchemy import event, text, TextClause
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.pool import NullPool
 from dataclasses import dataclass
 from datetime import datetime
 import json
@@ -14,7 +17,7 @@ logger = logging.getLogger(__name__)
 
 T = TypeVar('T')
 
-@dataclass
+@dataclass(slots=True)
 class Page:
     """data class representing a page entity"""
     id: Optional[int] = None
@@ -27,7 +30,7 @@ class Page:
     created_at: Optional[datetime] = None
     updated_at: Optional[datetime] = None
 
-@dataclass
+@dataclass(slots=True)
 class Category:
     """data class representing a category entity"""
     id: Optional[int] = None
@@ -42,46 +45,91 @@ class Page_Category:
     category_id: int
 
 class DatabaseConnection:
-    """manage database connections using connection pooling"""
+    """manage async database connections using connection pooling (one engine per db_url)"""
     _instances = {}
+    _lock = threading.Lock()
     
-    def __new__(cls, db_url: str):
-        if db_url not in cls._instances:
-            instance = super().__new__(cls)
-            instance.engine = create_engine(
-                db_url,
-                pool_size=10,
-                max_overflow=20,
-                pool_recycle=3600,
-                echo=False
-            )
-            instance.SessionLocal = sessionmaker(
-                autocommit=False,
-                autoflush=False,
-                bind=instance.engine
+    def __new__(cls, db_url: str, pool_size: int = 20, max_overflow: int = 10,
+                use_null_pool: bool = False, statement_timeout: int = 30_000):
+        # pool settings only apply to the first call for a given db_url
+        with cls._lock:
+            if db_url not in cls._instances:
+                instance = super().__new__(cls)
+                if use_null_pool:
+                    # behind PgBouncer in transaction mode pooling is done by the bouncer
+                    pool_options = {'poolclass': NullPool}
+                else:
+                    pool_options = {
+                        'pool_size': pool_size,
+                        'max_overflow': max_overflow,
+                        'pool_recycle': 3600
+                    }
+                instance.engine = create_async_engine(
+                    cls._async_url(db_url),
+                    # no ping round trip per checkout, stale connections are recycled instead
+                    pool_pre_ping=False,
+                    # rows per multi-row INSERT when an executemany INSERT is batched by SQLAlchemy
+                    insertmanyvalues_page_size=1000,
+                    echo=False,
+                    **pool_options
+                )
+                if statement_timeout:
+                    cls._set_statement_timeout(instance.engine, statement_timeout)
+                instance.SessionLocal = async_sessionmaker(
+                    bind=instance.engine,
+                    autoflush=False,
+                    expire_on_commit=False
+                )
+                cls._instances[db_url] = instance
+            return cls._instances[db_url]
+    
+    @staticmethod
+    def _set_statement_timeout(engine, timeout_ms: int):
+        """cap every statement on the engine's new connections, guards against runaway scans"""
+        @event.listens_for(engine.sync_engine, 'connect')
+        def set_timeout(dbapi_connection, connection_record):
+            dbapi_connection.run_async(
+                lambda conn: conn.execute(f"SET statement_timeout = {int(timeout_ms)}")
             )
-            cls._instances[db_url] = instance
-        return cls._instances[db_url]
     
-    @contextmanager
-    def get_session(self):
-        """context manager for database sessions"""
-        session = self.SessionLocal()
+    @staticmethod
+    def _async_url(db_url: str) -> str:
+        """switch a plain postgresql:// url to the asyncpg driver"""
+        url = make_url(db_url)
+        if url.drivername in ('postgresql', 'postgresql+psycopg2'):
+            url = url.set(drivername='postgresql+asyncpg')
+        return url.render_as_string(hide_password=False)
+    
+    @asynccontextmanager
+    async def get_session(self):
+        """async context manager for database sessions"""
+        session: AsyncSession = self.SessionLocal()
         try:
             yield session
-            session.commit()
+            await session.commit()
         except Exception as e:
-            session.rollback()
+            await session.rollback()
             logger.error(f"session rollback due to error: {e}")
             raise
         finally:
-            session.close()
+            await session.close()
+    
+    @asynccontextmanager
+    async def get_raw_connection(self):
+        """async context manager yielding the pooled asyncpg connection inside a transaction"""
+        async with self.engine.connect() as conn:
+            raw = await conn.get_raw_connection()
+            driver_connection = raw.driver_connection
+            async with driver_connection.transaction():
+                yield driver_connection
 
 class BaseRepository(ABC, Generic[T]):
     """abstract base repository with common operations"""
     
-    def __init__(self, db_url: str):
+    def __init__(self, db_url: str, read_db_url: Optional[str] = None):
         self.db = DatabaseConnection(db_url)
+        # read replica for SELECT-only methods, the primary when there is none
+        self.db_read = DatabaseConnection(read_db_url) if read_db_url else self.db
     
     @abstractmethod
     def _to_entity(self, row: Dict) -> T:
@@ -93,14 +141,36 @@ class BaseRepository(ABC, Generic[T]):
         """convert entity to database row"""
         pass
     
-    def _execute_query(self, query: str, params: Dict = None) -> List[Dict]:
+    @staticmethod
+    def _statement(query: Union[str, TextClause]) -> TextClause:
+        """accept both raw SQL strings and prebuilt text() constants"""
+        return text(query) if isinstance(query, str) else query
+    
+    # single statements run on a Core connection, no ORM session around them
+    async def _execute_query(self, query: Union[str, TextClause], params: Dict = None) -> List[Dict]:
         """execute a raw SQL query and return results"""
-        with self.db.get_session() as session:
-            result = session.execute(text(query), params or {})
+        async with self.db.engine.begin() as conn:
+            result = await conn.execute(self._statement(query), params or {})
+            return [dict(row._mapping) for row in result]
+    
+    async def _execute_query_ro(self, query: Union[str, TextClause], params: Dict = None) -> List[Dict]:
+        """execute a read-only SQL query on the read replica and return results"""
+        async with self.db_read.engine.connect() as conn:
+            result = await conn.execute(self._statement(query), params or {})
             return [dict(row._mapping) for row in result]
     
-    def _execute_update(self, query: str, params: Dict = None) -> int:
+    async def _stream_query_ro(self, query: Union[str, TextClause], params: Dict = None,
+                               yield_per: int = 1000) -> AsyncIterator[Dict]:
+        """execute a read-only SQL query on the read replica through a server-side cursor, row by row"""
+        async with self.db_read.engine.connect() as conn:
+            result = await conn.stream(
+                self._statement(query).execution_options(yield_per=yield_per), params or {}
+            )
+            async for row in result.mappings():
+                yield dict(row)
+    
+    async def _execute_update(self, query: Union[str, TextClause], params: Dict = None) -> int:
         """execute an update/insert/delete query"""
-        with self.db.get_session() as session:
-            result = session.execute(text(query), params or {})
+        async with self.db.engine.begin() as conn:
+            result = await conn.execute(self._statement(query), params or {})
             return result.rowcount
\ No newline at end of file
@@ -0,0 +1,62 @@
+# repositories/batcher.py
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, Generic, Hashable, List, Optional, Set, TypeVar
+
+logger = logging.getLogger(__name__)
+
+K = TypeVar('K', bound=Hashable)
+V = TypeVar('V')
+
+class Batcher(Generic[K, V]):
+    """coalesce concurrent single-key lookups arriving within a short window into one bulk query"""
+    
+    def __init__(self, load_many: Callable[[List[K]], Awaitable[Dict[K, V]]], window: float = 0.002,
+                 max_batch: int = 500):
+        self.load_many = load_many  # bulk loader: keys -> {key: value}, missing keys are absent
+        self.window = window  # seconds to wait for more callers before firing
+        self.max_batch = max_batch
+        self._pending: Dict[K, List[asyncio.Future]] = {}
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: Set[asyncio.Task] = set()  # running batches, the loop only keeps weak references
+    
+    async def get(self, key: K) -> Optional[V]:
+        """await the value for key, resolved together with every other key in the same batch"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.setdefault(key, []).append(future)
+        
+        if len(self._pending) >= self.max_batch:
+            self._fire()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._fire)
+        return await future
+    
+    def _fire(self):
+        """hand the collected keys to a background task and start a fresh batch"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        pending, self._pending = self._pending, {}
+        if pending:
+            task = asyncio.get_running_loop().create_task(self._run_batch(pending))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+    
+    async def _run_batch(self, pending: Dict[K, List[asyncio.Future]]):
+        """run one bulk query and resolve every waiting future from its result"""
+        try:
+            results = await self.load_many(list(pending))
+        except Exception as e:
+            logger.error(f"batch load of {len(pending)} keys failed: {e}")
+            for futures in pending.values():
+                for future in futures:
+                    if not future.done():
+                        future.set_exception(e)
+            return
+        
+        for key, futures in pending.items():
+            value = results.get(key)
+            for future in futures:
+                if not future.done():
+                    future.set_result(value)
@@ -14,6 +14,62 @@ logger = logging.getLogger(__name__)
 class CategoryRepository(BaseRepository[Category]):
     """repository for category table operations"""
     
+    # fixed-shape statements are built once at class level instead of on every call
+    _Q_LINK_PAGE = text("""
+        INSERT INTO page_category (page_id, category_id)
+        VALUES (:page_id, :category_id)
+    """)
+    _Q_GET_BY_ID = text("""
+        SELECT id, name, status, text_content
+        FROM category
+        WHERE id = :category_id
+    """)
+    _Q_GET_BY_IDS = text("""
+        SELECT id, name, status, text_content
+        FROM category
+        WHERE id = ANY(:ids)
+    """)
+    _Q_GET_BY_NAME = text("""
+        SELECT id, name, status, text_content
+        FROM category
+        WHERE LOWER(name) = LOWER(:name)
+        LIMIT 1
+    """)
+    _Q_GET_ALL = text("""
+        SELECT id, name, status, text_content
+        FROM category
+        ORDER BY id
+        LIMIT :limit OFFSET :offset
+    """)
+    _Q_SEARCH = text("""
+        SELECT id, name, status, text_content
+        FROM category
+        WHERE name ILIKE :keyword
+           OR text_content ILIKE :keyword
+        ORDER BY
+            CASE
+                WHEN name ILIKE :keyword_exact THEN 1
+                WHEN text_content ILIKE :keyword_exact THEN 2
+                ELSE 3
+            END,
+            name
+        LIMIT :limit
+    """)
+    _Q_UPDATE_TEXT_CONTENT = text("""
+        UPDATE category
+        SET text_content = :new_text
+        WHERE id = :category_id
+    """)
+    _Q_DELETE = text("DELETE FROM category WHERE id = :category_id")
+    _Q_COUNT = text("SELECT COUNT(*) as count FROM category")
+    # DO UPDATE is a no-op that makes RETURNING yield the existing row on conflict
+    _Q_GET_OR_CREATE = text("""
+        INSERT INTO category (name)
+        VALUES (:name)
+        ON CONFLICT (LOWER(name)) DO UPDATE SET name = category.name
+        RETURNING id, name, status, text_content, (xmax = 0) AS inserted
+    """)
+    
     def __init__(self, db_url: str):
         super().__init__(db_url)
         self.table_name = "category"
@@ -44,19 +100,15 @@ class CategoryRepository(BaseRepository[Category]):
     
     # CREATE Operations
     
-    def create(self, category: Category) -> Optional[Category]:
+    async def create(self, category: Category) -> Optional[Category]:
         """create a new category"""
         try:
-            # Check if category with same name exists
-            if self.get_by_name(category.name):
-                logger.warning(f"category with name '{category.name}' already exists")
-                return None
-            
             data = self._from_entity(category)
             
             columns = ', '.join(data.keys())
             placeholders = ', '.join([f':{key}' for key in data.keys()])
-            returning_clause = "RETURNING id"
+            # uniqueness is enforced by idx_category_name_lower, no pre-check SELECT
+            returning_clause = "ON CONFLICT (LOWER(name)) DO NOTHING RETURNING id"
             
             query = f"""
                 INSERT INTO {self.table_name} ({columns})
@@ -64,9 +116,9 @@ class CategoryRepository(BaseRepository[Category]):
                 {returning_clause}
             """
             
-            with self.db.get_session() as session:
-                result = session.execute(text(query), data)
-                session.commit()
+            async with self.db.get_session() as session:
+                result = await session.execute(text(query), data)
+                await session.commit()
                 
                 if result:
                     row = result.fetchone()
@@ -75,39 +127,32 @@ class CategoryRepository(BaseRepository[Category]):
                         logger.info(f"created category with ID: {category.id}")
                         return category
             
+            logger.warning(f"category with name '{category.name}' already exists")
             return None
             
         except SQLAlchemyError as e:
             logger.error(f"failed to create category: {e}")
             return None
     
-    def create_batch(self, categories: List[Category]) -> List[Category]:
+    async def create_batch(self, categories: List[Category]) -> List[Category]:
         """create multiple pages at once"""
         created_categories = []
         for category in categories:
-            created = self.create(category)
+            created = await self.create(category)
             if created:
                 created_categories.append(created)
         return created_categories
     
-    def link_page_to_category(self, page_id, category_id) -> Optional[Page_Category]:
+    async def link_page_to_category(self, page_id, category_id) -> Optional[Page_Category]:
         "adds a row to page_category linking a page to a category"
         data = {
             'page_id': page_id,
             'category_id': category_id
         }
         try:
-            columns = ', '.join(data.keys())
-            placeholders = ', '.join([f':{key}' for key in data.keys()])
-            
-            query = f"""
-                INSERT INTO page_category ({columns})
-                VALUES ({placeholders})
-            """
-            
-            with self.db.get_session() as session:
-                result = session.execute(text(query), data)
-                session.commit()
+            async with self.db.get_session() as session:
+                result = await session.execute(self._Q_LINK_PAGE, data)
+                await session.commit()
                     
                 if result:
                     
@@ -118,18 +163,10 @@ class CategoryRepository(BaseRepository[Category]):
     
     # READ Operations
     
-    def get_by_id(self, category_id: int) -> Optional[Category]:
+    async def get_by_id(self, category_id: int) -> Optional[Category]:
         """get category by ID"""
         try:
-            query = f"""
-                SELECT c.*, 
-                       name,
-                       text_content
-                FROM {self.table_name} c
-                WHERE c.id = :category_id
-            """
-            
-            result = self._execute_query(query, {'category_id': category_id})
+            result = await self._execute_query(self._Q_GET_BY_ID, {'category_id': category_id})
             if result:
                 return self._to_entity(result[0])
             return None
@@ -138,16 +175,22 @@ class CategoryRepository(BaseRepository[Category]):
             logger.error(f"Failed to get category by ID {category_id}: {e}")
             return None
     
-    def get_by_name(self, name: str) -> Optional[Category]:
-        """get category by name (case-insensitive)"""
+    async def get_by_ids(self, category_ids: List[int]) -> Dict[int, Category]:
+        """get many categories in one round trip, keyed by id; missing ids are absent"""
+        if not category_ids:
+            return {}
         try:
-            query = f"""
-                SELECT * FROM {self.table_name} 
-                WHERE LOWER(name) = LOWER(:name)
-                LIMIT 1
-            """
+            result = await self._execute_query(self._Q_GET_BY_IDS, {'ids': list(category_ids)})
+            return {row['id']: self._to_entity(row) for row in result}
             
-            result = self._execute_query(query, {'name': name})
+        except SQLAlchemyError as e:
+            logger.error(f"Failed to get categories by IDs: {e}")
+            return {}
+    
+    async def get_by_name(self, name: str) -> Optional[Category]:
+        """get category by name (case-insensitive)"""
+        try:
+            result = await self._execute_query(self._Q_GET_BY_NAME, {'name': name})
             if result:
                 return self._to_entity(result[0])
             return None
@@ -156,53 +199,33 @@ class CategoryRepository(BaseRepository[Category]):
             logger.error(f"Failed to get category by name '{name}': {e}")
             return None
     
-    def get_all(self, limit: int = 100, offset: int = 0) -> List[Category]:
+    async def get_all(self, limit: int = 100, offset: int = 0) -> List[Category]:
         """get all categories with pagination"""
         try:
-            query = f"""
-                SELECT * FROM {self.table_name} 
-                ORDER BY id 
-                LIMIT :limit OFFSET :offset
-            """
-            
-            result = self._execute_query(query, {'limit': limit, 'offset': offset})
+            result = await self._execute_query(self._Q_GET_ALL, {'limit': limit, 'offset': offset})
             return [self._to_entity(row) for row in result]
             
         except SQLAlchemyError as e:
             logger.error(f"Failed to get all categories: {e}")
             return []
     
-    def search(self, keyword: str, limit: int = 50) -> List[Category]:
+    async def search(self, keyword: str, limit: int = 50) -> List[Category]:
         """search categories by keyword in title or text"""
         try:
-            query = f"""
-                SELECT * FROM {self.table_name} 
-                WHERE name ILIKE :keyword 
-                   OR text_content ILIKE :keyword
-                ORDER BY 
-                    CASE 
-                        WHEN name ILIKE :keyword_exact THEN 1
-                        WHEN text_content ILIKE :keyword_exact THEN 2
-                        ELSE 3
-                    END,
-                    views DESC
-                LIMIT :limit
-            """
-            
             params = {
                 'keyword': f'%{keyword}%',
                 'keyword_exact': f'%{keyword}%',
                 'limit': limit
             }
             
-            result = self._execute_query(query, params)
+            result = await self._execute_query(self._Q_SEARCH, params)
             return [self._to_entity(row) for row in result]
             
         except SQLAlchemyError as e:
             logger.error(f"failed to search categories with keyword '{keyword}': {e}")
             return []
     
-    def update(self, category: Category) -> bool:
+    async def update(self, category: Category) -> bool:
         """update an existing category"""
         try:
             if not category.id:
@@ -211,7 +234,7 @@ class CategoryRepository(BaseRepository[Category]):
             
             data = self._from_entity(category)
             
-            set_clause = ', '.join([f"{key} = :{key}" for key in data.keys()])
+            set_clause = ', '.join([f"{key} = :{key}" for key in data.keys() if key != 'id'])
             
             query = f"""
                 UPDATE {self.table_name} 
@@ -219,8 +242,8 @@ class CategoryRepository(BaseRepository[Category]):
                 WHERE id = :id
             """
             
-            data['id'] = 'DEFAULT'
-            rowcount = self._execute_update(query, data)
+            data['id'] = category.id
+            rowcount = await self._execute_update(query, data)
             
             if rowcount > 0:
                 logger.info(f"updated category with ID: {category.id}")
@@ -231,16 +254,10 @@ class CategoryRepository(BaseRepository[Category]):
             logger.error(f"failed to update category {category.id}: {e}")
             return False
     
-    def update_text_content(self, category_id: int, new_text: str) -> bool:
+    async def update_text_content(self, category_id: int, new_text: str) -> bool:
         """update category text content"""
         try:
-            query = f"""
-                UPDATE {self.table_name} 
-                SET text_content = :new_text
-                WHERE id = :category_id
-            """
-            
-            rowcount = self._execute_update(query, {
+            rowcount = await self._execute_update(self._Q_UPDATE_TEXT_CONTENT, {
                 'category_id': category_id,
                 'new_text': new_text
             })
@@ -256,11 +273,10 @@ class CategoryRepository(BaseRepository[Category]):
     
     # DELETE Operations
     
-    def delete(self, category_id: int) -> bool:
+    async def delete(self, category_id: int) -> bool:
         """delete a category by ID"""
         try:
-            query = f"DELETE FROM {self.table_name} WHERE id = :category_id"
-            rowcount = self._execute_update(query, {'category_id': category_id})
+            rowcount = await self._execute_update(self._Q_DELETE, {'category_id': category_id})
             
             if rowcount > 0:
                 logger.info(f"deleted category with ID: {category_id}")
@@ -271,12 +287,12 @@ class CategoryRepository(BaseRepository[Category]):
             logger.error(f"failed to delete category {category_id}: {e}")
             return False
     
-    def delete_by_title(self, name: str) -> bool:
+    async def delete_by_title(self, name: str) -> bool:
         """delete a category by name"""
         try:
-            category = self.get_by_name(name)
+            category = await self.get_by_name(name)
             if category and category.id:
-                return self.delete(category.id)
+                return await self.delete(category.id)
             return False
             
         except SQLAlchemyError as e:
@@ -285,26 +301,26 @@ class CategoryRepository(BaseRepository[Category]):
     
     # statistics and analytics
     
-    def count(self) -> int:
+    async def count(self) -> int:
         """count total categories"""
         try:
-            query = f"SELECT COUNT(*) as count FROM {self.table_name}"
-            result = self._execute_query(query)
+            result = await self._execute_query(self._Q_COUNT)
             return result[0]['count'] if result else 0
             
         except SQLAlchemyError as e:
             logger.error(f"failed to count categories: {e}")
             return 0
     
-    def get_or_create_by_name(self, name: str) -> Optional[Category]:
-        '''gets category by name or creates if it doesn't exist'''
-        category = self.get_by_name(name)
-        if category == None:
-            logger.warning(f"creating empty category with the name {name}")
-            self.create(Category(name=name))
-            return self.get_by_name(name)
-        else:
-            return category
-        
-    
-    
\ No newline at end of file
+    async def get_or_create_by_name(self, name: str) -> Optional[Category]:
+        '''gets category by name or creates if it doesn't exist, in one round trip'''
+        try:
+            result = await self._execute_query(self._Q_GET_OR_CREATE, {'name': name})
+            if not result:
+                return None
+            if result[0]['inserted']:
+                logger.warning(f"creating empty category with the name {name}")
+            return self._to_entity(result[0])
+            
+        except SQLAlchemyError as e:
+            logger.error(f"failed to get or create category '{name}': {e}")
+            return None
@@ -1,66 +1,188 @@
-from decimal import Decimal
-from typing import List, Optional, Dict, Any
+import csv
+from typing import AsyncIterator, List, Optional, Dict, Any, Tuple, Set
 from dataclasses import dataclass, asdict
 from datetime import datetime
 import json
 from .base_repository import BaseRepository, Page, DatabaseConnection
+from .ttl_cache import ttl_cache
 from sqlalchemy.exc import SQLAlchemyError
 import logging
-from sqlalchemy import text
+from sqlalchemy import text, func, Table, Column, MetaData, Integer, String, Text
+from sqlalchemy.dialects.postgresql import insert
+import asyncpg
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# fixed column order shared by _row, create_batch and update(fields=...)
+PAGE_INSERT_COLUMNS = ('title', 'project_id', 'views', 'status', 'namespace_id', 'text')
+
+# Core table for statements SQLAlchemy builds itself (create_batch)
+page_table = Table(
+    'page', MetaData(),
+    Column('id', Integer, primary_key=True),
+    Column('title', String(255), nullable=False),
+    Column('project_id', Integer),
+    Column('views', Integer),
+    Column('status', String(20)),
+    Column('namespace_id', Integer),
+    Column('text', Text)
+)
+STATS_TTL = 30  # seconds get_statistics / get_top_viewed results are reused
+TRGM_MIN_KEYWORD = 3  # pg_trgm indexes need at least one full trigram
+# columns copy_from_csv needs in the denormalized export (save_denormalized_to_csv.sql)
+CSV_REQUIRED_COLUMNS = ('title', 'text', 'project_name', 'namespace_name', 'categories', 'view_count')
+
 class PageRepository(BaseRepository[Page]):
     """repository for page table operations"""
     
-    def __init__(self, db_url: str):
-        super().__init__(db_url)
+    # explicit column lists keep tsv (and text, for summaries) off the wire
+    _Q_GET_BY_ID = text("""
+        SELECT id, title, project_id, views, status, namespace_id, text
+        FROM page
+        WHERE id = :page_id
+    """)
+    _Q_GET_SUMMARY_BY_ID = text("""
+        SELECT id, title, project_id, views, status, namespace_id
+        FROM page
+        WHERE id = :page_id
+    """)
+    _Q_GET_BY_ID_WITH_RELATIONS = text("""
+        SELECT p.id, p.title, p.project_id, p.views, p.status, p.namespace_id, p.text,
+               pr.name as project_name,
+               n.name as namespace_name
+        FROM page p
+        LEFT JOIN project pr ON p.project_id = pr.id
+        LEFT JOIN namespace n ON p.namespace_id = n.id
+        WHERE p.id = :page_id
+    """)
+    # probe on page_title_lower_uniq (migration 002)
+    _Q_GET_BY_TITLE = text("""
+        SELECT id, title, project_id, views, status, namespace_id, text
+        FROM page
+        WHERE LOWER(title) = :title_lower
+        LIMIT 1
+    """)
+    _Q_GET_ALL = text("""
+        SELECT id, title, project_id, views, status, namespace_id, text
+        FROM page
+        WHERE id > :after_id
+        ORDER BY id
+        LIMIT :limit
+    """)
+    _Q_ITER_ALL = text("""
+        SELECT id, title, project_id, views, status, namespace_id, text
+        FROM page
+        WHERE id > :after_id
+        ORDER BY id
+    """)
+    # tsv is left out of the select list, it is only needed for matching
+    _Q_SEARCH = text("""
+        SELECT id, title, project_id, views, status, namespace_id, text
+        FROM page
+        WHERE tsv @@ plainto_tsquery('simple', :keyword)
+        ORDER BY ts_rank(tsv, plainto_tsquery('simple', :keyword)) DESC, views DESC
+        LIMIT :limit
+    """)
+    # served by page_title_trgm / page_text_trgm, best title matches first
+    _Q_SEARCH_SUBSTRING = text("""
+        SELECT id, title, project_id, views, status, namespace_id, text
+        FROM page
+        WHERE title ILIKE :keyword
+           OR text ILIKE :keyword
+        ORDER BY similarity(title, :keyword_raw) DESC, views DESC
+        LIMIT :limit
+    """)
+    _Q_SEARCH_SHORT = text("""
+        SELECT id, title, project_id, views, status, namespace_id, text
+        FROM page
+        WHERE title ILIKE :keyword
+           OR text ILIKE :keyword
+        ORDER BY views DESC
+        LIMIT :limit
+    """)
+    _Q_GET_BY_PROJECT = text("""
+        SELECT id, title, project_id, views, status, namespace_id, text
+        FROM page
+        WHERE project_id = :project_id
+        ORDER BY views DESC
+        LIMIT :limit
+    """)
+    _Q_GET_TOP_VIEWED = text("""
+        SELECT id, title, project_id, views, status, namespace_id, text
+        FROM page
+        ORDER BY views DESC
+        LIMIT :limit
+    """)
+    _Q_UPDATE_VIEWS = text("""
+        UPDATE page
+        SET views = views + :increment
+        WHERE id = :page_id
+    """)
+    _Q_ADD_VIEWS = text("""
+        UPDATE page
+        SET views = page.views + t.increment
+        FROM unnest(CAST(:page_ids AS integer[]), CAST(:increments AS integer[])) AS t(id, increment)
+        WHERE page.id = t.id
+    """)
+    _Q_UPDATE_TEXT = text("""
+        UPDATE page
+        SET text = :new_text
+        WHERE id = :page_id
+    """)
+    _Q_DELETE = text("DELETE FROM page WHERE id = :page_id")
+    _Q_DELETE_BY_PROJECT = text("DELETE FROM page WHERE project_id = :project_id")
+    _Q_COUNT = text("SELECT COUNT(*) as count FROM page")
+    # casts make the driver hand back int/float directly instead of Decimal
+    _Q_STATISTICS = text("""
+        SELECT
+            COUNT(*)::bigint as total_pages,
+            COALESCE(SUM(views), 0)::bigint as total_views,
+            COALESCE(AVG(views), 0)::float8 as avg_views,
+            MAX(views)::bigint as max_views,
+            MIN(views)::bigint as min_views,
+            COUNT(DISTINCT project_id)::bigint as projects_count,
+            COUNT(DISTINCT namespace_id)::bigint as namespaces_count
+        FROM page
+    """)
+    
+    def __init__(self, db_url: str, read_db_url: Optional[str] = None):
+        super().__init__(db_url, read_db_url)
         self.table_name = "page"
+        # bumped on writes, drops the ttl_cache entries of get_statistics / get_top_viewed
+        self._cache_version = 0
+    
+    def _invalidate_cache(self):
+        """forget cached aggregates after a write; view increments only age out with the TTL"""
+        self._cache_version += 1
     
     def _to_entity(self, row: Dict) -> Page:
-        """convert database row to page entity"""
-        return Page(
-            id=row.get('id'),
-            title=row.get('title', ''),
-            project_id=row.get('project_id'),
-            views=row.get('views', 0),
-            status=row.get('status', 'active'),
-            namespace_id=row.get('namespace_id'),
-            text=row.get('text', '')
-        )
+        """convert database row to page entity, every query selects Page field names only"""
+        return Page(**row)
+    
+    @staticmethod
+    def _row(page: Page) -> tuple:
+        """page values in PAGE_INSERT_COLUMNS order"""
+        return (page.title, page.project_id, page.views, page.status, page.namespace_id, page.text)
     
     def _from_entity(self, page: Page) -> Dict:
-        """convert page entity to database row"""
-        data = {
-            'title': page.title,
-            'project_id': page.project_id,
-            'views': page.views,
-            'status': page.status,
-            'namespace_id': page.namespace_id,
-            'text': page.text
-        }
-        
+        """convert page entity to database row, None columns are left to the table defaults"""
+        data = {k: v for k, v in zip(PAGE_INSERT_COLUMNS, self._row(page)) if v is not None}
         if page.id:
             data['id'] = page.id
-            
-        return {k: v for k, v in data.items() if v is not None}
+        return data
     
     # CREATE Operations
     
-    def create(self, page: Page) -> Optional[Page]:
+    async def create(self, page: Page) -> Optional[Page]:
         """create a new page"""
         try:
-            # Check if page with same title exists
-            if self.get_by_title(page.title):
-                logger.warning(f"page with title '{page.title}' already exists")
-                return None
-            
             data = self._from_entity(page)
             
             columns = ', '.join(data.keys())
             placeholders = ', '.join([f':{key}' for key in data.keys()])
-            returning_clause = "RETURNING id"
+            # uniqueness is enforced by page_title_lower_uniq, no pre-check SELECT
+            returning_clause = "ON CONFLICT ((LOWER(title))) DO NOTHING RETURNING id"
             
             query = f"""
                 INSERT INTO {self.table_name} ({columns})
@@ -68,48 +190,169 @@ class PageRepository(BaseRepository[Page]):
                 {returning_clause}
             """
             
-            with self.db.get_session() as session:
-                result = session.execute(text(query), data)
-                session.commit()
-                
-                if result:
-                    row = result.fetchone()
-                    if row:
-                        page.id = row.id
-                        logger.info(f"created page with ID: {page.id}")
-                        return page
+            async with self.db.engine.begin() as conn:
+                row = (await conn.execute(text(query), data)).fetchone()
             
+            if row:
+                page.id = row.id
+                self._invalidate_cache()
+                logger.info(f"created page with ID: {page.id}")
+                return page
+            
+            logger.warning(f"page with title '{page.title}' already exists")
             return None
             
         except SQLAlchemyError as e:
             logger.error(f"failed to create page: {e}")
             return None
     
-    def create_batch(self, pages: List[Page]) -> List[Page]:
-        """create multiple pages at once"""
-        created_pages = []
-        for page in pages:
-            created = self.create(page)
-            if created:
-                created_pages.append(created)
-        return created_pages
+    async def create_batch(self, pages: List[Page]) -> List[Page]:
+        """create multiple pages at once: multi-row INSERT ... ON CONFLICT DO NOTHING, one transaction"""
+        if not pages:
+            return []
+        try:
+            # repeats inside the batch are dropped here, titles already in the table by ON CONFLICT
+            new_pages = {}
+            for page in pages:
+                new_pages.setdefault(page.title.lower(), page)
+            
+            # one Core statement; SQLAlchemy's insertmanyvalues splits it into multi-row INSERT pages
+            statement = (
+                insert(page_table)
+                .on_conflict_do_nothing(index_elements=[func.lower(page_table.c.title)])
+                .returning(page_table.c.id, page_table.c.title)
+            )
+            rows = [dict(zip(PAGE_INSERT_COLUMNS, self._row(page))) for page in new_pages.values()]
+            created_pages = []
+            async with self.db.engine.begin() as conn:
+                result = await conn.execute(statement, rows)
+                for row in result:
+                    page = new_pages[row.title.lower()]
+                    page.id = row.id
+                    created_pages.append(page)
+            
+            self._invalidate_cache()
+            logger.info(f"created {len(created_pages)} pages, skipped {len(pages) - len(created_pages)} existing")
+            return created_pages
+            
+        except SQLAlchemyError as e:
+            logger.error(f"failed to create pages in batch: {e}")
+            return []
+    
+    async def copy_from_csv(self, csv_path: str) -> Optional[Dict[str, int]]:
+        """
+        bulk load the denormalized pages csv: COPY into a temp stage table, then set-based
+        INSERT ... SELECT for projects, namespaces, categories, pages and links in one transaction
+        """
+        try:
+            with open(csv_path, 'rb') as f:
+                header = next(csv.reader([f.readline().decode('utf-8-sig')]))
+                columns = [col.strip().lower().replace(' ', '_') for col in header]
+                missing = [col for col in CSV_REQUIRED_COLUMNS if col not in columns]
+                if missing:
+                    logger.error(f"csv {csv_path} is missing columns: {missing}")
+                    return None
+                
+                async with self.db.get_raw_connection() as conn:
+                    # a rerunnable bulk load does not need to wait for the WAL flush on commit
+                    await conn.execute("SET LOCAL synchronous_commit = off")
+                    # large files may outlast the engine's per-statement cap
+                    await conn.execute("SET LOCAL statement_timeout = 0")
+                    # temp tables are not WAL-logged and vanish with the transaction
+                    # header names come from the file, so quote them as identifiers
+                    quoted = [col.replace('"', '""') for col in columns]
+                    stage_columns = ', '.join(f'"{col}" text' for col in quoted)
+                    await conn.execute(f"""
+                        CREATE TEMP TABLE page_csv_stage (
+                            {stage_columns},
+                            csv_line bigserial
+                        ) ON COMMIT DROP
+                    """)
+                    status = await conn.copy_to_table(
+                        'page_csv_stage', source=f, columns=columns, format='csv'
+                    )
+                    total_rows = int(status.split()[-1])
+                    stats = await self._merge_csv_stage(conn, total_rows)
+            
+            # the transaction committed on leaving the block above
+            self._invalidate_cache()
+            logger.info(f"copied pages from csv: {stats}")
+            return stats
+            
+        except (OSError, StopIteration) as e:
+            logger.error(f"failed to read csv {csv_path}: {e}")
+            return None
+        except (SQLAlchemyError, asyncpg.PostgresError) as e:
+            logger.error(f"failed to copy pages from {csv_path}: {e}")
+            return None
+    
+    async def _merge_csv_stage(self, conn, total_rows: int) -> Dict[str, int]:
+        """move page_csv_stage rows into the real tables, first csv row wins for a repeated title; runs uncommitted"""
+        await conn.execute(r"""
+            CREATE TEMP TABLE page_csv_new ON COMMIT DROP AS
+            SELECT DISTINCT ON (LOWER(btrim(s.title)))
+                   btrim(s.title) AS title,
+                   coalesce(btrim(s.text), '') AS text,
+                   CASE WHEN btrim(s.view_count) ~ '^\d+$' THEN btrim(s.view_count)::bigint ELSE 0 END AS views,
+                   NULLIF(btrim(s.project_name), '') AS project_name,
+                   NULLIF(btrim(s.namespace_name), '') AS namespace_name,
+                   regexp_split_to_array(NULLIF(btrim(s.categories), ''), '\s*;\s*') AS categories
+            FROM page_csv_stage s
+            WHERE btrim(s.title) <> ''
+              AND NOT EXISTS (SELECT 1 FROM page p WHERE LOWER(p.title) = LOWER(btrim(s.title)))
+            ORDER BY LOWER(btrim(s.title)), s.csv_line
+        """)
+        for table, column in (('project', 'project_name'), ('namespace', 'namespace_name')):
+            await conn.execute(f"""
+                INSERT INTO {table} (name)
+                SELECT DISTINCT n.{column} FROM page_csv_new n
+                WHERE n.{column} IS NOT NULL
+                  AND NOT EXISTS (SELECT 1 FROM {table} t WHERE t.name = n.{column})
+            """)
+        await conn.execute("""
+            INSERT INTO category (name)
+            SELECT DISTINCT ON (LOWER(c.name)) c.name
+            FROM page_csv_new n, unnest(n.categories) AS c(name)
+            WHERE c.name <> ''
+            ON CONFLICT (LOWER(name)) DO NOTHING
+        """)
+        row = await conn.fetchrow(f"""
+            WITH new_pages AS (
+                INSERT INTO {self.table_name} (title, text, views, project_id, namespace_id, status)
+                SELECT n.title, n.text, n.views,
+                       (SELECT min(id) FROM project WHERE name = n.project_name),
+                       (SELECT min(id) FROM namespace WHERE name = n.namespace_name),
+                       'stub'
+                FROM page_csv_new n
+                ON CONFLICT ((LOWER(title))) DO NOTHING
+                RETURNING id, title
+            ), new_links AS (
+                INSERT INTO page_category (page_id, category_id)
+                SELECT DISTINCT np.id, c.id
+                FROM new_pages np
+                JOIN page_csv_new n ON n.title = np.title
+                CROSS JOIN LATERAL unnest(n.categories) AS split(name)
+                JOIN category c ON LOWER(c.name) = LOWER(split.name)
+                ON CONFLICT DO NOTHING
+                RETURNING 1
+            )
+            SELECT (SELECT count(*) FROM new_pages) AS pages_created,
+                   (SELECT count(*) FROM new_links) AS links_created
+        """)
+        stats = {
+            'total_rows': total_rows,
+            'pages_created': row['pages_created'],
+            'pages_skipped': total_rows - row['pages_created'],
+            'links_created': row['links_created']
+        }
+        return stats
     
     # READ Operations
     
-    def get_by_id(self, page_id: int) -> Optional[Page]:
+    async def get_by_id(self, page_id: int) -> Optional[Page]:
         """get page by ID"""
         try:
-            query = f"""
-                SELECT p.*, 
-                       pr.name as project_name,
-                       n.name as namespace_name
-                FROM {self.table_name} p
-                LEFT JOIN project pr ON p.project_id = pr.id
-                LEFT JOIN namespace n ON p.namespace_id = n.id
-                WHERE p.id = :page_id
-            """
-            
-            result = self._execute_query(query, {'page_id': page_id})
+            result = await self._execute_query_ro(self._Q_GET_BY_ID, {'page_id': page_id})
             if result:
                 return self._to_entity(result[0])
             return None
@@ -118,16 +361,33 @@ class PageRepository(BaseRepository[Page]):
             logger.error(f"failed to get page by ID {page_id}: {e}")
             return None
     
-    def get_by_title(self, title: str) -> Optional[Page]:
-        """get page by title (case-insensitive)"""
+    async def get_summary_by_id(self, page_id: int) -> Optional[Page]:
+        """get page metadata by ID, text is not loaded and stays empty"""
         try:
-            query = f"""
-                SELECT * FROM {self.table_name} 
-                WHERE LOWER(title) = LOWER(:title)
-                LIMIT 1
-            """
+            result = await self._execute_query_ro(self._Q_GET_SUMMARY_BY_ID, {'page_id': page_id})
+            if result:
+                return self._to_entity(result[0])
+            return None
             
-            result = self._execute_query(query, {'title': title})
+        except SQLAlchemyError as e:
+            logger.error(f"failed to get page summary by ID {page_id}: {e}")
+            return None
+    
+    async def get_by_id_with_relations(self, page_id: int) -> Optional[Dict[str, Any]]:
+        """get page row by ID together with its project_name and namespace_name"""
+        try:
+            result = await self._execute_query_ro(self._Q_GET_BY_ID_WITH_RELATIONS, {'page_id': page_id})
+            return result[0] if result else None
+            
+        except SQLAlchemyError as e:
+            logger.error(f"failed to get page with relations by ID {page_id}: {e}")
+            return None
+    
+    async def get_by_title(self, title: str) -> Optional[Page]:
+        """get page by title (case-insensitive)"""
+        try:
+            # lowered once in python
+            result = await self._execute_query_ro(self._Q_GET_BY_TITLE, {'title_lower': title.lower()})
             if result:
                 return self._to_entity(result[0])
             return None
@@ -136,95 +396,119 @@ class PageRepository(BaseRepository[Page]):
             logger.error(f"failed to get page by title '{title}': {e}")
             return None
     
-    def get_all(self, limit: int = 100, offset: int = 0) -> List[Page]:
-        """get all pages with pagination"""
+    async def get_all(self, limit: int = 100, after_id: int = 0) -> Tuple[List[Page], Optional[int]]:
+        """
+        get pages by keyset pagination: up to limit pages with id > after_id, plus the last id
+        to pass as after_id for the next page (None once a short page shows there are no more)
+        """
         try:
-            query = f"""
-                SELECT * FROM {self.table_name} 
-                ORDER BY id 
-                LIMIT :limit OFFSET :offset
-            """
-            
-            result = self._execute_query(query, {'limit': limit, 'offset': offset})
-            return [self._to_entity(row) for row in result]
+            result = await self._execute_query_ro(self._Q_GET_ALL, {'limit': limit, 'after_id': after_id})
+            pages = [self._to_entity(row) for row in result]
+            return pages, (result[-1]['id'] if result and len(result) == limit else None)
             
         except SQLAlchemyError as e:
             logger.error(f"failed to get all pages: {e}")
-            return []
+            return [], None
     
-    def search(self, keyword: str, limit: int = 50) -> List[Page]:
-        """search pages by keyword in title or text"""
+    async def iter_all(self, after_id: int = 0) -> AsyncIterator[Page]:
+        """every page with id > after_id in id order, streamed instead of paged for exports; errors propagate"""
         try:
-            query = f"""
-                SELECT * FROM {self.table_name} 
-                WHERE title ILIKE :keyword 
-                   OR text ILIKE :keyword
-                ORDER BY 
-                    CASE 
-                        WHEN title ILIKE :keyword_exact THEN 1
-                        WHEN text ILIKE :keyword_exact THEN 2
-                        ELSE 3
-                    END,
-                    views DESC
-                LIMIT :limit
-            """
-            
-            params = {
-                'keyword': f'%{keyword}%',
-                'keyword_exact': f'%{keyword}%',
-                'limit': limit
-            }
+            async for row in self._stream_query_ro(self._Q_ITER_ALL, {'after_id': after_id}):
+                yield self._to_entity(row)
             
-            result = self._execute_query(query, params)
+        except SQLAlchemyError as e:
+            logger.error(f"failed to stream all pages: {e}")
+            raise
+    
+    async def search(self, keyword: str, limit: int = 50, substring: bool = False) -> List[Page]:
+        """search pages by keyword in title or text; whole words via the tsv index unless substring=True"""
+        try:
+            query, params = self._search_statement(keyword, limit, substring)
+            result = await self._execute_query_ro(query, params)
             return [self._to_entity(row) for row in result]
             
         except SQLAlchemyError as e:
             logger.error(f"failed to search pages with keyword '{keyword}': {e}")
             return []
     
-    def get_by_project(self, project_id: int, limit: int = 100) -> List[Page]:
-        """get pages by project ID"""
+    async def iter_search(self, keyword: str, limit: int = 50_000,
+                          substring: bool = False) -> AsyncIterator[Page]:
+        """search() for large limits: pages are yielded from a server-side cursor as they arrive; errors propagate"""
         try:
-            query = f"""
-                SELECT * FROM {self.table_name} 
-                WHERE project_id = :project_id
-                ORDER BY views DESC
-                LIMIT :limit
-            """
+            query, params = self._search_statement(keyword, limit, substring)
+            async for row in self._stream_query_ro(query, params):
+                yield self._to_entity(row)
             
-            result = self._execute_query(query, {'project_id': project_id, 'limit': limit})
+        except SQLAlchemyError as e:
+            logger.error(f"failed to stream search results for keyword '{keyword}': {e}")
+            raise
+    
+    def _search_statement(self, keyword: str, limit: int, substring: bool):
+        """pick the search query and its params"""
+        if not substring:
+            return self._Q_SEARCH, {'keyword': keyword, 'limit': limit}
+        # ILIKE '%keyword%' backed by the pg_trgm indexes; too short for trigrams -> plain LIMIT'd scan
+        query = self._Q_SEARCH_SHORT if len(keyword) < TRGM_MIN_KEYWORD else self._Q_SEARCH_SUBSTRING
+        return query, {
+            'keyword': f'%{keyword}%',
+            'keyword_raw': keyword,
+            'limit': limit
+        }
+    
+    async def get_by_project(self, project_id: int, limit: int = 100) -> List[Page]:
+        """get pages by project ID"""
+        try:
+            result = await self._execute_query_ro(self._Q_GET_BY_PROJECT, {'project_id': project_id, 'limit': limit})
             return [self._to_entity(row) for row in result]
             
         except SQLAlchemyError as e:
             logger.error(f"failed to get pages for project {project_id}: {e}")
             return []
     
-    def get_top_viewed(self, limit: int = 10) -> List[Page]:
+    @ttl_cache(maxsize=16, ttl=STATS_TTL)
+    async def get_top_viewed(self, limit: int = 10) -> List[Page]:
         """get top viewed pages"""
         try:
-            query = f"""
-                SELECT * FROM {self.table_name} 
-                ORDER BY views DESC 
-                LIMIT :limit
-            """
-            
-            result = self._execute_query(query, {'limit': limit})
+            result = await self._execute_query_ro(self._Q_GET_TOP_VIEWED, {'limit': limit})
             return [self._to_entity(row) for row in result]
             
         except SQLAlchemyError as e:
             logger.error(f"failed to get top viewed pages: {e}")
             return []
     
+    @ttl_cache(maxsize=16, ttl=STATS_TTL)
+    async def get_top_viewed_raw(self, limit: int = 10) -> List[Dict[str, Any]]:
+        """get top viewed pages as plain row dicts for endpoints that serialize them straight away"""
+        try:
+            return await self._execute_query_ro(self._Q_GET_TOP_VIEWED, {'limit': limit})
+            
+        except SQLAlchemyError as e:
+            logger.error(f"failed to get top viewed pages: {e}")
+            return []
+    
     # UPDATE Operations
     
-    def update(self, page: Page) -> bool:
-        """update an existing page"""
+    async def update(self, page: Page, fields: Optional[Set[str]] = None) -> bool:
+        """
+        update an existing page; fields limits the SET list to the columns that changed
+        (None means every non-empty column) so an untouched text is not rewritten
+        """
         try:
             if not page.id:
                 logger.error("cannot update page without ID")
                 return False
             
-            data = self._from_entity(page)
+            if fields is None:
+                data = self._from_entity(page)
+                data.pop('id', None)
+            else:
+                unknown = set(fields) - set(PAGE_INSERT_COLUMNS)
+                if unknown:
+                    logger.error(f"cannot update unknown page fields: {sorted(unknown)}")
+                    return False
+                data = {key: getattr(page, key) for key in PAGE_INSERT_COLUMNS if key in fields}
+            if not data:
+                return True
             
             set_clause = ', '.join([f"{key} = :{key}" for key in data.keys()])
             
@@ -234,11 +518,11 @@ class PageRepository(BaseRepository[Page]):
                 WHERE id = :id
             """
             
-            #data['id'] = page.id
-            data['id'] = 'DEFAULT'
-            rowcount = self._execute_update(query, data)
+            data['id'] = page.id
+            rowcount = await self._execute_update(query, data)
             
             if rowcount > 0:
+                self._invalidate_cache()
                 logger.info(f"updated page with ID: {page.id}")
                 return True
             return False
@@ -247,16 +531,10 @@ class PageRepository(BaseRepository[Page]):
             logger.error(f"failed to update page {page.id}: {e}")
             return False
     
-    def update_views(self, page_id: int, increment: int = 1) -> bool:
+    async def update_views(self, page_id: int, increment: int = 1) -> bool:
         """increment page views"""
         try:
-            query = f"""
-                UPDATE {self.table_name} 
-                SET views = views + :increment
-                WHERE id = :page_id
-            """
-            
-            rowcount = self._execute_update(query, {
+            rowcount = await self._execute_update(self._Q_UPDATE_VIEWS, {
                 'page_id': page_id,
                 'increment': increment
             })
@@ -270,21 +548,30 @@ class PageRepository(BaseRepository[Page]):
             logger.error(f"failed to update views for page {page_id}: {e}")
             return False
     
-    def update_text(self, page_id: int, new_text: str) -> bool:
-        """update page text content"""
+    async def add_views(self, increments: Dict[int, int]) -> Optional[int]:
+        """apply many accumulated view increments in one UPDATE, returns pages updated or None on error"""
         try:
-            query = f"""
-                UPDATE {self.table_name} 
-                SET text = :new_text
-                WHERE id = :page_id
-            """
+            rowcount = await self._execute_update(self._Q_ADD_VIEWS, {
+                'page_ids': list(increments.keys()),
+                'increments': list(increments.values())
+            })
+            logger.debug(f"added views for {rowcount} pages")
+            return rowcount
             
-            rowcount = self._execute_update(query, {
+        except SQLAlchemyError as e:
+            logger.error(f"failed to add views for {len(increments)} pages: {e}")
+            return None
+    
+    async def update_text(self, page_id: int, new_text: str) -> bool:
+        """update page text content"""
+        try:
+            rowcount = await self._execute_update(self._Q_UPDATE_TEXT, {
                 'page_id': page_id,
                 'new_text': new_text
             })
             
             if rowcount > 0:
+                self._invalidate_cache()
                 logger.info(f"updated text for page {page_id}")
                 return True
             return False
@@ -295,13 +582,13 @@ class PageRepository(BaseRepository[Page]):
     
     # DELETE Operations
     
-    def delete(self, page_id: int) -> bool:
+    async def delete(self, page_id: int) -> bool:
         """delete a page by ID"""
         try:
-            query = f"DELETE FROM {self.table_name} WHERE id = :page_id"
-            rowcount = self._execute_update(query, {'page_id': page_id})
+            rowcount = await self._execute_update(self._Q_DELETE, {'page_id': page_id})
             
             if rowcount > 0:
+                self._invalidate_cache()
                 logger.info(f"deleted page with ID: {page_id}")
                 return True
             return False
@@ -310,24 +597,24 @@ class PageRepository(BaseRepository[Page]):
             logger.error(f"failed to delete page {page_id}: {e}")
             return False
     
-    def delete_by_title(self, title: str) -> bool:
+    async def delete_by_title(self, title: str) -> bool:
         """delete a page by title"""
         try:
-            page = self.get_by_title(title)
+            page = await self.get_by_title(title)
             if page and page.id:
-                return self.delete(page.id)
+                return await self.delete(page.id)
             return False
             
         except SQLAlchemyError as e:
             logger.error(f"failed to delete page with title '{title}': {e}")
             return False
     
-    def delete_by_project(self, project_id: int) -> int:
+    async def delete_by_project(self, project_id: int) -> int:
         """delete all pages in a project, returns count deleted"""
         try:
-            query = f"DELETE FROM {self.table_name} WHERE project_id = :project_id"
-            rowcount = self._execute_update(query, {'project_id': project_id})
+            rowcount = await self._execute_update(self._Q_DELETE_BY_PROJECT, {'project_id': project_id})
             
+            self._invalidate_cache()
             logger.info(f"deleted {rowcount} pages from project {project_id}")
             return rowcount
             
@@ -337,40 +624,22 @@ class PageRepository(BaseRepository[Page]):
     
     # Statistics and Analytics
     
-    def count(self) -> int:
+    async def count(self) -> int:
         """count total pages"""
         try:
-            query = f"SELECT COUNT(*) as count FROM {self.table_name}"
-            result = self._execute_query(query)
+            result = await self._execute_query_ro(self._Q_COUNT)
             return result[0]['count'] if result else 0
             
         except SQLAlchemyError as e:
             logger.error(f"failed to count pages: {e}")
             return 0
     
-    def get_statistics(self) -> Dict[str, Any]:
+    @ttl_cache(maxsize=16, ttl=STATS_TTL)
+    async def get_statistics(self) -> Dict[str, Any]:
         """get page statistics"""
         try:
-            query = """
-                SELECT 
-                    COUNT(*) as total_pages,
-                    SUM(views) as total_views,
-                    AVG(views) as avg_views,
-                    MAX(views) as max_views,
-                    MIN(views) as min_views,
-                    COUNT(DISTINCT project_id) as projects_count,
-                    COUNT(DISTINCT namespace_id) as namespaces_count
-                FROM page
-            """
-            stats = {}
-            result = self._execute_query(query)
-            for key, value in result[0].items():
-                if isinstance(value, Decimal):
-                    stats[key] = float(value)
-                else:
-                    stats[key] = value
-            return stats
-        
+            result = await self._execute_query_ro(self._Q_STATISTICS)
+            return dict(result[0])
             
         except SQLAlchemyError as e:
             logger.error(f"failed to get statistics: {e}")
@@ -0,0 +1,35 @@
+# repositories/ttl_cache.py
+import functools
+import time
+from collections import OrderedDict
+
+def ttl_cache(maxsize: int = 16, ttl: float = 30.0):
+    """
+    memoize an async repository method for ttl seconds, least recently used entries evicted
+    past maxsize; entries are keyed by self._cache_version so a bump drops them all.
+    falsy results are not stored, repositories return {} / [] on errors
+    """
+    def decorator(method):
+        entries = OrderedDict()  # key -> (expires_at, value)
+        
+        @functools.wraps(method)
+        async def wrapper(self, *args, **kwargs):
+            key = (self, getattr(self, '_cache_version', 0), args, tuple(sorted(kwargs.items())))
+            now = time.monotonic()
+            entry = entries.get(key)
+            if entry is not None and entry[0] > now:
+                entries.move_to_end(key)
+                return entry[1]
+            
+            value = await method(self, *args, **kwargs)
+            if not value:
+                return value
+            entries[key] = (now + ttl, value)
+            entries.move_to_end(key)
+            while len(entries) > maxsize:
+                entries.popitem(last=False)
+            return value
+        
+        wrapper.cache_clear = entries.clear
+        return wrapper
+    return decorator
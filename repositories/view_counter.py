@@ -0,0 +1,78 @@
+# repositories/view_counter.py
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+class ViewCounter:
+    """accumulate page view increments in memory and write them in one statement per interval"""
+    
+    def __init__(self, flush_views: Callable[[Dict[int, int]], Awaitable[Optional[int]]],
+                 interval: float = 1.0, max_pending: int = 1000):
+        self.flush_views = flush_views  # {page_id: increment} -> rows updated, None on failure
+        self.interval = interval  # seconds between flushes
+        self.max_pending = max_pending  # distinct pages that trigger an early flush
+        self._pending: Dict[int, int] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._flushing: Optional[asyncio.Task] = None
+    
+    def incr(self, page_id: int, increment: int = 1):
+        """count a view, it reaches the database with the next flush"""
+        self._pending[page_id] = self._pending.get(page_id, 0) + increment
+        if len(self._pending) >= self.max_pending and (self._flushing is None or self._flushing.done()):
+            self._flushing = asyncio.get_running_loop().create_task(self._flush_logged())
+    
+    def _restore(self, pending: Dict[int, int]):
+        """merge increments that did not reach the database back into the buffer"""
+        for page_id, increment in pending.items():
+            self._pending[page_id] = self._pending.get(page_id, 0) + increment
+    
+    async def flush(self) -> int:
+        """write everything accumulated so far; failed increments go back into the buffer"""
+        pending, self._pending = self._pending, {}
+        if not pending:
+            return 0
+        try:
+            updated = await self.flush_views(pending)
+        except BaseException:
+            # also covers cancellation mid-write, so stop() can still retry them
+            self._restore(pending)
+            raise
+        if updated is None:
+            self._restore(pending)
+            return 0
+        return updated
+    
+    async def _flush_logged(self) -> int:
+        """flush for background callers, errors are logged and the buffer kept"""
+        try:
+            return await self.flush()
+        except Exception as e:
+            logger.error(f"view counter flush failed: {e}")
+            return 0
+    
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            await self._flush_logged()
+    
+    def start(self):
+        """start the periodic flush on the running loop"""
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+    
+    async def stop(self):
+        """stop the periodic flush and write what is left"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._flushing is not None:
+            await asyncio.gather(self._flushing, return_exceptions=True)
+        await self._flush_logged()
+        if self._pending:
+            logger.error(f"view counter stopped with {len(self._pending)} pages not written")
@@ -1,6 +1,7 @@
 import pytest
 from fastapi.testclient import TestClient
-from unittest.mock import Mock, patch
+import httpx
+from unittest.mock import AsyncMock, Mock, patch
 from KRA_repos.aggregate import app 
 
 client = TestClient(app)
@@ -11,6 +12,20 @@ SERVICE_URLS = {
     "page": "http://localhost:8000/pages"
 }
 
+@pytest.fixture(scope="module", autouse=True)
+def mock_client():
+    """patch the gateway's http client once for the whole module"""
+    client_mock = Mock(get=AsyncMock(), put=AsyncMock(), delete=AsyncMock())
+    with patch.object(app.state, 'client', client_mock, create=True):
+        yield client_mock
+
+@pytest.fixture(autouse=True)
+def reset_mock_client(mock_client):
+    """drop return values, side effects and recorded calls after every test"""
+    yield
+    for method in (mock_client.get, mock_client.put, mock_client.delete):
+        method.reset_mock(return_value=True, side_effect=True)
+
 # test root endpoint
 def test_root():
     response = client.get("/")
@@ -18,13 +33,12 @@ def test_root():
     assert response.json() == {"message": "Hello World"}
 
 # test endpoints with mocked external services
-@patch('aggregate.requests.get')
-def test_get_category_by_id_success(mock_get):
+def test_get_category_by_id_success(mock_client):
     # Setup mock response
     mock_response = Mock()
     mock_response.json.return_value = {"id": 1, "name": "Test Category"}
     mock_response.raise_for_status.return_value = None
-    mock_get.return_value = mock_response
+    mock_client.get.return_value = mock_response
     
     # Make request
     response = client.get("/categories/1")
@@ -32,75 +46,94 @@ def test_get_category_by_id_success(mock_get):
     assert response.status_code == 200
     assert response.json() == {"id": 1, "name": "Test Category"}
 
-@patch('aggregate.requests.get')
-def test_get_category_by_id_not_found(mock_get):
+def test_get_category_by_id_not_found(mock_client):
     """test that 404 from external service returns 404 from service"""
-    from requests.exceptions import HTTPError
-    from unittest.mock import Mock
-    
     mock_response = Mock()
     mock_response.status_code = 404
     mock_response.json.return_value = {"detail": "Category not found"}
     
-    http_error = HTTPError("404 Not Found")
-    http_error.response = mock_response
+    http_error = httpx.HTTPStatusError("404 Not Found", request=Mock(), response=mock_response)
     mock_response.raise_for_status.side_effect = http_error
     
-    mock_get.return_value = mock_response
+    mock_client.get.return_value = mock_response
     
     response = client.get("/categories/999")
     
     assert response.status_code == 404
 
-@patch('aggregate.requests.get')
-def test_get_page_by_id_success(mock_get):
+def test_get_page_by_id_success(mock_client):
     mock_response = Mock()
     mock_response.json.return_value = {"id": 1, "title": "Test Page", "views": 100}
     mock_response.raise_for_status.return_value = None
-    mock_get.return_value = mock_response
+    mock_client.get.return_value = mock_response
     
     response = client.get("/pages/1")
     assert response.status_code == 200
     assert response.json()["title"] == "Test Page"
 
-@patch('aggregate.requests.get')
-def test_get_page_stats_success(mock_get):
+def test_get_page_stats_success(mock_client):
     mock_response = Mock()
     mock_response.json.return_value = {"total_pages": 10, "total_views": 1500}
     mock_response.raise_for_status.return_value = None
-    mock_get.return_value = mock_response
+    mock_client.get.return_value = mock_response
     
     response = client.get("/pages/stats")
     assert response.status_code == 200
     assert "total_pages" in response.json()
 
-@patch('aggregate.requests.put')
-def test_update_views_success(mock_put):
+def test_get_top_pages_success(mock_client):
+    mock_response = Mock()
+    mock_response.json.return_value = [{"id": 1, "title": "Test Page", "views": 100}]
+    mock_response.raise_for_status.return_value = None
+    mock_client.get.return_value = mock_response
+    
+    response = client.get("/pages/top?limit=5")
+    assert response.status_code == 200
+    assert response.json()[0]["views"] == 100
+    mock_client.get.assert_called_once_with("http://localhost:8000/pages/top", params={"limit": 5})
+
+def test_get_page_full_success(mock_client):
+    page_response = Mock()
+    page_response.json.return_value = {"id": 1, "title": "Test Page", "views": 100}
+    page_response.raise_for_status.return_value = None
+    stats_response = Mock()
+    stats_response.json.return_value = {"total_pages": 10, "total_views": 1500}
+    stats_response.raise_for_status.return_value = None
+    
+    async def fake_get(url):
+        return stats_response if url.endswith("/stats") else page_response
+    mock_client.get.side_effect = fake_get
+    
+    response = client.get("/pages/1/full")
+    assert response.status_code == 200
+    assert response.json()["page"]["title"] == "Test Page"
+    assert response.json()["stats"]["total_pages"] == 10
+    assert mock_client.get.await_count == 2
+
+def test_update_views_success(mock_client):
     mock_response = Mock()
     mock_response.json.return_value = {"id": 1, "views": 101}
     mock_response.raise_for_status.return_value = None
-    mock_put.return_value = mock_response
+    mock_client.put.return_value = mock_response
     
     response = client.get("/pages/update_views/1")
     assert response.status_code == 200
     assert response.json()["views"] == 101
+    mock_client.put.assert_awaited_once_with(SERVICE_URLS["page"] + "/update_views/1")
 
-@patch('aggregate.requests.delete')
-def test_delete_page_success(mock_delete):
+def test_delete_page_success(mock_client):
     mock_response = Mock()
     mock_response.json.return_value = {"message": "Page deleted successfully"}
     mock_response.raise_for_status.return_value = None
-    mock_delete.return_value = mock_response
+    mock_client.delete.return_value = mock_response
     
     response = client.get("/pages/delete/1")
     assert response.status_code == 200
     assert "deleted" in response.json()["message"]
 
 # test for network errors
-@patch('aggregate.requests.get')
-def test_service_unavailable(mock_get):
-    from requests.exceptions import RequestException
-    mock_get.side_effect = RequestException("Service unavailable")
+def test_service_unavailable(mock_client):
+    mock_client.get.side_effect = httpx.ConnectError("Service unavailable")
     
     response = client.get("/categories/1")
     assert response.status_code == 500
\ No newline at end of file
@@ -0,0 +1,155 @@
+import asyncio
+import pytest
+from unittest.mock import AsyncMock
+from KRA_repos.repositories import ttl_cache as ttl_cache_module
+from KRA_repos.repositories.batcher import Batcher
+from KRA_repos.repositories.ttl_cache import ttl_cache
+from KRA_repos.repositories.view_counter import ViewCounter
+
+# Batcher: concurrent lookups share one bulk query
+async def test_batcher_duplicate_keys_share_one_load():
+    load_many = AsyncMock(side_effect=lambda keys: {key: key * 10 for key in keys})
+    batcher = Batcher(load_many)
+
+    results = await asyncio.gather(batcher.get(1), batcher.get(2), batcher.get(1))
+
+    assert results == [10, 20, 10]
+    load_many.assert_awaited_once()
+    assert sorted(load_many.await_args.args[0]) == [1, 2]
+
+async def test_batcher_keeps_running_batches():
+    release = asyncio.Event()
+
+    async def load_many(keys):
+        await release.wait()
+        return {key: key for key in keys}
+
+    batcher = Batcher(load_many, max_batch=1)
+    waiter = asyncio.ensure_future(batcher.get(1))
+    await asyncio.sleep(0)
+    assert len(batcher._tasks) == 1
+    release.set()
+    assert await waiter == 1
+    await asyncio.sleep(0)
+    assert not batcher._tasks
+
+async def test_batcher_missing_key_resolves_none():
+    batcher = Batcher(AsyncMock(return_value={}))
+    assert await batcher.get(1) is None
+
+async def test_batcher_loader_error_reaches_every_waiter():
+    batcher = Batcher(AsyncMock(side_effect=RuntimeError("db down")))
+
+    results = await asyncio.gather(batcher.get(1), batcher.get(1), batcher.get(2), return_exceptions=True)
+
+    assert len(results) == 3
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+async def test_batcher_fires_at_max_batch():
+    load_many = AsyncMock(side_effect=lambda keys: {key: key for key in keys})
+    batcher = Batcher(load_many, window=60, max_batch=2)
+
+    results = await asyncio.wait_for(asyncio.gather(batcher.get(1), batcher.get(2)), timeout=1)
+
+    assert results == [1, 2]
+    load_many.assert_awaited_once()
+
+class Counted:
+    """repository stand-in that counts how often the wrapped method really runs"""
+    def __init__(self, value=None):
+        self._cache_version = 0
+        self.calls = 0
+        self.value = value
+
+    @ttl_cache(maxsize=2, ttl=30)
+    async def load(self, key):
+        self.calls += 1
+        return {'key': key} if self.value is None else self.value
+
+# ttl_cache: memoized per instance, version and ttl
+async def test_ttl_cache_hit():
+    repo = Counted()
+    assert await repo.load(1) == await repo.load(1) == {'key': 1}
+    assert repo.calls == 1
+
+async def test_ttl_cache_expiry(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(ttl_cache_module.time, 'monotonic', lambda: now[0])
+    repo = Counted()
+    await repo.load(1)
+    now[0] += 29
+    await repo.load(1)
+    assert repo.calls == 1
+    now[0] += 2
+    await repo.load(1)
+    assert repo.calls == 2
+
+async def test_ttl_cache_version_bump():
+    repo = Counted()
+    await repo.load(1)
+    repo._cache_version += 1
+    await repo.load(1)
+    assert repo.calls == 2
+
+async def test_ttl_cache_falsy_not_stored():
+    repo = Counted(value={})
+    assert await repo.load(1) == {}
+    assert await repo.load(1) == {}
+    assert repo.calls == 2
+
+async def test_ttl_cache_lru_eviction():
+    repo = Counted()
+    await repo.load(1)
+    await repo.load(2)
+    await repo.load(1)
+    await repo.load(3)  # evicts 2, the least recently used
+    await repo.load(1)
+    assert repo.calls == 3
+    await repo.load(2)
+    assert repo.calls == 4
+
+# ViewCounter: increments are buffered and written per flush
+async def test_view_counter_accumulates_increments():
+    flush_views = AsyncMock(return_value=2)
+    counter = ViewCounter(flush_views)
+    counter.incr(1)
+    counter.incr(1)
+    counter.incr(2, increment=5)
+
+    assert await counter.flush() == 2
+    flush_views.assert_awaited_once_with({1: 2, 2: 5})
+    assert await counter.flush() == 0
+    flush_views.assert_awaited_once()
+
+async def test_view_counter_early_flush_at_max_pending():
+    flush_views = AsyncMock(return_value=2)
+    counter = ViewCounter(flush_views, interval=60, max_pending=2)
+    counter.incr(1)
+    counter.incr(2)
+    await asyncio.wait_for(counter._flushing, timeout=1)
+
+    flush_views.assert_awaited_once_with({1: 1, 2: 1})
+
+async def test_view_counter_failed_flush_keeps_buffer():
+    counter = ViewCounter(AsyncMock(return_value=None))
+    counter.incr(1)
+    assert await counter.flush() == 0
+    assert counter._pending == {1: 1}
+
+async def test_view_counter_raising_flush_keeps_buffer():
+    flush_views = AsyncMock(side_effect=RuntimeError("db down"))
+    counter = ViewCounter(flush_views)
+    counter.incr(1, increment=3)
+    with pytest.raises(RuntimeError):
+        await counter.flush()
+    counter.incr(1)
+    assert counter._pending == {1: 4}
+
+    # stop() logs instead of raising, so lifespan cleanup still runs
+    await counter.stop()
+    assert counter._pending == {1: 4}
+    flush_views.side_effect = None
+    flush_views.return_value = 1
+    await counter.flush()
+    flush_views.assert_awaited_with({1: 4})
+    assert counter._pending == {}